@@ -1,12 +1,14 @@
 # app.py
 import streamlit as st
 import pandas as pd
+import numpy as np
 import sqlite3
 import hashlib
 from datetime import datetime
-import altair as alt
-import math
 import os
+import atexit
+import threading
+from health_kernels import lttb_indices
 
 # -------------------------
 # CONFIG / UTILITIES
@@ -14,59 +16,18 @@ import os
 DB_PATH = "users.db"
 FOODS_CSV = "foods.csv"
 EXERCISES_CSV = "exercises.csv"
-
-# ----------------------------
-# Load foods.csv safely
-foods_df = pd.read_csv(FOODS_CSV, encoding="utf-8")
-
-# Normalize column names
-foods_df.columns = foods_df.columns.str.strip().str.lower()
-
-# Rename alternative headers to standard ones
-rename_map = {
-    "name": "food_name",
-    "cal_per_100g": "calories",
-    "diet_tag": "diet_type"
-}
-foods_df.rename(columns=rename_map, inplace=True)
-
-# Auto-add meal_type if missing
-if "meal_type" not in foods_df.columns:
-    import numpy as np
-    meal_types = ["breakfast", "lunch", "dinner", "snack"]
-    foods_df["meal_type"] = np.resize(meal_types, len(foods_df))
-
-# Auto-add diet_type if missing
-if "diet_type" not in foods_df.columns:
-    foods_df["diet_type"] = "veg"   # default value
-
-# Debug: confirm schema
-st.write("✅ Final Foods CSV columns:", foods_df.columns.tolist())
-st.dataframe(foods_df.head())
-# ==============================
-# Load foods.csv safely
-# ==============================
-foods_df = pd.read_csv(FOODS_CSV, encoding="utf-8", delimiter=",")
-foods_df.columns = foods_df.columns.str.strip().str.lower()
-
-# Debug: Check if file loaded correctly (remove later)
-st.write("Foods CSV columns:", foods_df.columns.tolist())
-st.dataframe(foods_df.head())
-
-# ==============================
-# Load exercises.csv safely
-# ==============================
-exercises_df = pd.read_csv(EXERCISES_CSV, encoding="utf-8", delimiter=",")
-exercises_df.columns = exercises_df.columns.str.strip().str.lower()
-
-# Debug: Check if file loaded correctly (remove later)
-st.write("Exercises CSV columns:", exercises_df.columns.tolist())
-st.dataframe(exercises_df.head())
+LANDING_CSS = "static/landing.css"
 
 # Ensure DB exists and create tables if not
+# (cached so every rerun shares one connection)
+@st.cache_resource
 def init_db():
     conn = sqlite3.connect(DB_PATH, check_same_thread=False)
     c = conn.cursor()
+    # WAL + NORMAL sync makes the small inserts from add_progress cheaper
+    # (set before any writes: synchronous can't change inside a transaction)
+    c.execute("PRAGMA journal_mode=WAL")
+    c.execute("PRAGMA synchronous=NORMAL")
     c.execute('''
     CREATE TABLE IF NOT EXISTS users (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,75 +50,143 @@ def init_db():
         FOREIGN KEY(user_id) REFERENCES users(id)
     );
     ''')
+    # Migrate legacy progress tables that stored ISO date strings to epoch days.
+    # Rename, create, copy and drop run in one transaction; a progress_old table
+    # left behind by an earlier interrupted migration is copied over and dropped.
+    cols = {row[1]: row[2] for row in c.execute("PRAGMA table_info(progress)")}
+    tables = {row[0] for row in c.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    legacy = cols.get('date', '').upper() == 'TEXT'
+    c.execute("BEGIN")
+    if legacy:
+        c.execute("ALTER TABLE progress RENAME TO progress_old")
     c.execute('''
     CREATE TABLE IF NOT EXISTS progress (
         id INTEGER PRIMARY KEY AUTOINCREMENT,
         user_id INTEGER,
-        date TEXT,
+        date INTEGER,
         weight_kg REAL,
         calories_consumed INTEGER,
         completed BOOLEAN,
         notes TEXT
     );
     ''')
+    if legacy or 'progress_old' in tables:
+        # ids are reassigned: a stranded progress table may already hold new rows
+        c.execute('''
+        INSERT INTO progress (user_id, date, weight_kg, calories_consumed, completed, notes)
+        SELECT user_id, CAST(julianday(date) - 2440587.5 AS INTEGER), weight_kg, calories_consumed, completed, notes
+        FROM progress_old ORDER BY id
+        ''')
+        c.execute("DROP TABLE progress_old")
+    conn.commit()
+    # Index for get_progress (by user, ordered by date); users.username is already
+    # covered by the automatic index from its UNIQUE constraint
+    c.execute("CREATE INDEX IF NOT EXISTS idx_progress_user_date ON progress(user_id, date)")
+    c.execute("DROP INDEX IF EXISTS idx_users_username")
+    c.execute("PRAGMA cache_size=-20000")   # ~20 MB page cache
     conn.commit()
     return conn
 
+@st.cache_resource
+def init_db_lock():
+    # the cached connection is shared by every session thread, so each
+    # execute + commit on it must hold this lock
+    return threading.Lock()
+
 conn = init_db()
+db_lock = init_db_lock()
+
+# SQL used on the hot path, kept as constants so the identical text hits
+# sqlite3's per-connection statement cache; helpers call conn.execute directly
+_STMT_INSERT_USER = "INSERT INTO users (username, password_hash, full_name) VALUES (?, ?, ?)"
+_STMT_AUTH = "SELECT id, password_hash FROM users WHERE username = ?"
+_STMT_SAVE_PROFILE = '''
+    INSERT OR REPLACE INTO profiles (user_id, age, sex, height_cm, weight_kg, activity_level, goal, diet_pref, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+_STMT_GET_PROFILE = "SELECT age, sex, height_cm, weight_kg, activity_level, goal, diet_pref FROM profiles WHERE user_id = ?"
+_STMT_INSERT_PROGRESS = "INSERT INTO progress (user_id, date, weight_kg, calories_consumed, completed, notes) VALUES (?, ?, ?, ?, ?, ?)"
+_STMT_GET_PROGRESS = "SELECT date, weight_kg, calories_consumed, completed, notes FROM progress WHERE user_id = ? ORDER BY date"
 
 def hash_password(password: str):
     return hashlib.sha256(password.encode()).hexdigest()
 
 def register_user(username, password, full_name=""):
-    c = conn.cursor()
-    try:
-        c.execute("INSERT INTO users (username, password_hash, full_name) VALUES (?, ?, ?)",
-                  (username, hash_password(password), full_name))
-        conn.commit()
-        return True, None
-    except sqlite3.IntegrityError as e:
-        return False, "Username already exists."
+    with db_lock:
+        try:
+            conn.execute(_STMT_INSERT_USER, (username, hash_password(password), full_name))
+            conn.commit()
+            return True, None
+        except sqlite3.IntegrityError as e:
+            conn.rollback()
+            return False, "Username already exists."
 
 def authenticate(username, password):
-    c = conn.cursor()
-    c.execute("SELECT id, password_hash FROM users WHERE username = ?", (username,))
-    row = c.fetchone()
+    row = conn.execute(_STMT_AUTH, (username,)).fetchone()
     if row and hash_password(password) == row[1]:
         return True, row[0]
     return False, None
 
 def save_profile(user_id, profile):
-    c = conn.cursor()
-    c.execute('''
-    INSERT OR REPLACE INTO profiles (user_id, age, sex, height_cm, weight_kg, activity_level, goal, diet_pref, created_at)
-    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-    ''', (user_id, profile['age'], profile['sex'], profile['height_cm'], profile['weight_kg'],
-          profile['activity_level'], profile['goal'], profile['diet_pref'], datetime.now().isoformat()))
-    conn.commit()
+    with db_lock:
+        conn.execute(_STMT_SAVE_PROFILE, (user_id, profile['age'], profile['sex'], profile['height_cm'], profile['weight_kg'],
+                                          profile['activity_level'], profile['goal'], profile['diet_pref'], datetime.now().isoformat()))
+        conn.commit()
+    st.session_state['profile'] = profile
 
 def get_profile(user_id):
-    c = conn.cursor()
-    c.execute("SELECT age, sex, height_cm, weight_kg, activity_level, goal, diet_pref FROM profiles WHERE user_id = ?", (user_id,))
-    row = c.fetchone()
+    row = conn.execute(_STMT_GET_PROFILE, (user_id,)).fetchone()
     if row:
         keys = ['age','sex','height_cm','weight_kg','activity_level','goal','diet_pref']
         return dict(zip(keys,row))
     return None
 
-def add_progress(user_id, date, weight_kg=None, calories_consumed=None, completed=False, notes=""):
-    c = conn.cursor()
-    c.execute("INSERT INTO progress (user_id, date, weight_kg, calories_consumed, completed, notes) VALUES (?, ?, ?, ?, ?, ?)",
-              (user_id, date, weight_kg, calories_consumed, int(completed), notes))
-    conn.commit()
+def _profile(user_id):
+    # session-cached get_profile; save_profile refreshes it and logout clears it
+    p = st.session_state.get('profile')
+    if p is None:
+        p = get_profile(user_id)
+        st.session_state['profile'] = p
+    return p
+
+EPOCH_DATE = datetime(1970, 1, 1).date()
+
+PROGRESS_BATCH_SIZE = 32
+
+def _write_progress(db, pending):
+    # write all buffered progress rows in one transaction; caller holds db_lock
+    if pending:
+        db.executemany(_STMT_INSERT_PROGRESS, pending)
+        db.commit()
+        pending.clear()
+
+def flush_progress(db, pending, lock):
+    with lock:
+        _write_progress(db, pending)
+
+@st.cache_resource
+def progress_queue():
+    # write-behind buffer shared across reruns (a module-level list would be reset on each rerun);
+    # every session thread shares it, so appends and flushes hold db_lock like all other writes
+    pending = []
+    atexit.register(flush_progress, conn, pending, db_lock)
+    return pending
+
+def add_progress(user_id, date, weight_kg=None, calories_consumed=None, completed=False, notes="", force=False):
+    # progress.date is stored as integer days since the unix epoch
+    pending = progress_queue()
+    with db_lock:
+        pending.append((user_id, (date - EPOCH_DATE).days, weight_kg, calories_consumed, int(completed), notes))
+        if force or len(pending) >= PROGRESS_BATCH_SIZE:
+            _write_progress(conn, pending)
 
 def get_progress(user_id):
-    c = conn.cursor()
-    c.execute("SELECT date, weight_kg, calories_consumed, completed, notes FROM progress WHERE user_id = ? ORDER BY date", (user_id,))
-    rows = c.fetchall()
-    df = pd.DataFrame(rows, columns=['date','weight_kg','calories_consumed','completed','notes'])
-    if not df.empty:
-        df['date'] = pd.to_datetime(df['date'])
-    return df
+    flush_progress(conn, progress_queue(), db_lock)
+    # read straight into typed columns instead of boxing every row as Python objects first
+    return pd.read_sql_query(
+        _STMT_GET_PROGRESS, conn, params=(user_id,),
+        parse_dates={'date': {'unit': 'D', 'origin': 'unix'}},
+        dtype={'weight_kg': 'float32', 'calories_consumed': 'Int32', 'completed': 'bool'})
 
 # -------------------------
 # HEALTH CALCS
@@ -198,15 +227,47 @@ GOAL_ADJUSTMENT = {
     "Build muscle": 250
 }
 
-def target_calories(bmr, activity_level, goal):
-    multiplier = ACTIVITY_MULTIPLIER.get(activity_level, 1.2)
-    maintenance = bmr * multiplier
-    adjust = GOAL_ADJUSTMENT.get(goal, 0)
-    return int(round(maintenance + adjust))
+# Integer-indexed lookup tables (same order as the selectbox options)
+ACTIVITY_LEVELS = tuple(ACTIVITY_MULTIPLIER)
+GOALS = tuple(GOAL_ADJUSTMENT)
+ACTIVITY_INDEX = {k: i for i, k in enumerate(ACTIVITY_LEVELS)}
+GOAL_INDEX = {k: i for i, k in enumerate(GOALS)}
+_ACT = np.array([ACTIVITY_MULTIPLIER[k] for k in ACTIVITY_LEVELS], dtype=np.float64)
+_ADJ = np.array([GOAL_ADJUSTMENT[k] for k in GOALS], dtype=np.int32)
+
+def target_calories(bmr, a_idx, g_idx):
+    return int(round(bmr * _ACT[a_idx] + _ADJ[g_idx]))
 
 # -------------------------
 # LOAD DATASETS
 # -------------------------
+# Alternative CSV headers -> the names used throughout the app
+FOODS_RENAME_MAP = {
+    "name": "food_name",
+    "cal_per_100g": "cal_per_serving",   # treat 100g as one serving
+    "diet_tag": "diet_type"
+}
+
+EXERCISES_RENAME_MAP = {
+    "name": "exercise_name",
+    "goal_tag": "goals",
+    "level": "difficulty"
+}
+
+# Columns the app relies on after renaming; checked once when each CSV is loaded
+FOODS_REQUIRED_COLUMNS = ["food_name", "cal_per_serving", "diet_type", "meal_type"]
+EXERCISES_REQUIRED_COLUMNS = ["exercise_name", "goals", "duration_min", "difficulty"]
+
+# Exercise goal spellings -> the lowercased profile goal they should match
+EXERCISE_GOAL_ALIASES = {
+    "maintenance": "maintain"
+}
+
+def check_columns(df, required, path):
+    missing = [c for c in required if c not in df.columns]
+    if missing:
+        raise ValueError(f"{path} is missing required columns: {missing}")
+
 @st.cache_data
 def load_foods():
     if not os.path.exists(FOODS_CSV):
@@ -220,7 +281,23 @@ def load_foods():
             ["Paneer stir-fry", "veg", 450, "dinner"]
         ], columns=["food_name","diet_type","cal_per_serving","meal_type"])
         df.to_csv(FOODS_CSV, index=False)
-    return pd.read_csv(FOODS_CSV)
+    df = pd.read_csv(FOODS_CSV, encoding="utf-8")
+    # Normalize column names
+    df.columns = df.columns.str.strip().str.lower()
+    # Rename alternative headers to standard ones
+    df.rename(columns=FOODS_RENAME_MAP, inplace=True)
+    # Auto-add meal_type if missing
+    if "meal_type" not in df.columns:
+        meal_types = ["breakfast", "lunch", "dinner", "snack"]
+        df["meal_type"] = np.resize(meal_types, len(df))
+    # Auto-add diet_type if missing
+    if "diet_type" not in df.columns:
+        df["diet_type"] = "veg"   # default value
+    check_columns(df, FOODS_REQUIRED_COLUMNS, FOODS_CSV)
+    # Lowercased categoricals so filters compare int codes instead of strings
+    for col in ["diet_type", "meal_type"]:
+        df[col] = df[col].str.lower().astype("category")
+    return df
 
 @st.cache_data
 def load_exercises():
@@ -234,39 +311,76 @@ def load_exercises():
             ["HIIT 20min", "Lose weight", 20, "none","hard"]
         ], columns=["exercise_name","goals","duration_min","equipment","difficulty"])
         df.to_csv(EXERCISES_CSV, index=False)
-    return pd.read_csv(EXERCISES_CSV)
+    df = pd.read_csv(EXERCISES_CSV, encoding="utf-8")
+    df.columns = df.columns.str.strip().str.lower()
+    df.rename(columns=EXERCISES_RENAME_MAP, inplace=True)
+    check_columns(df, EXERCISES_REQUIRED_COLUMNS, EXERCISES_CSV)
+    df["difficulty"] = df["difficulty"].astype("category")
+    return df
 
-foods_df = load_foods()
-ex_df = load_exercises()
+@st.cache_data
+def load_foods_by_diet():
+    # group once at load time so submits only do a dict lookup
+    df = load_foods()
+    return {d: sub for d, sub in df.groupby('diet_type', observed=True)}
+
+@st.cache_data
+def load_exercise_goals():
+    # one row per (exercise, goal) so goal matching is an equality filter, not a substring scan
+    df = load_exercises()
+    df['goals_list'] = df['goals'].str.lower().str.split(',', regex=False)
+    long = df.explode('goals_list').rename(columns={'goals_list': 'goal'})
+    long['goal'] = long['goal'].str.strip().replace(EXERCISE_GOAL_ALIASES).astype('category')
+    return long
+
+# -------------------------
+# RECOMMENDATIONS
+# -------------------------
+# Inputs are a small closed set (diet, goal), so results are cached per key
+# and later submits skip Pandas entirely.
+@st.cache_data
+def recommend_foods(diet_pref):
+    # candidate foods for every meal slot in one pass: {meal_type: records},
+    # preferring diet_pref and falling back to any diet for slots it doesn't cover
+    foods = load_foods()
+    diet_foods = load_foods_by_diet().get(diet_pref.lower(), foods.iloc[0:0])
+    by_meal = {mt: sub.to_dict('records') for mt, sub in foods.groupby('meal_type', observed=True)}
+    by_meal.update({mt: sub.to_dict('records') for mt, sub in diet_foods.groupby('meal_type', observed=True)})
+    return by_meal
+
+@st.cache_data
+def recommend_exercises(goal, n=5):
+    goals = load_exercise_goals()
+    # empty when nothing matches; the random fallback is drawn by the caller so it isn't cached
+    recs = goals[goals['goal'] == goal.lower()]
+    return recs.head(n).to_dict('records')
+
+# -------------------------
+# CHART HELPERS
+# -------------------------
+CHART_MAX_POINTS = 200
+
+def downsample(df, col, n_out=CHART_MAX_POINTS):
+    # keep chart payloads a constant size however long the history gets
+    if len(df) <= n_out:
+        return df
+    x = df['date'].to_numpy(dtype='datetime64[ns]').astype(np.int64).astype(np.float64)
+    y = df[col].to_numpy(dtype=np.float64)
+    return df.iloc[lttb_indices(x, y, n_out)]
 
 # -------------------------
 # UI / PAGES
 # -------------------------
 st.set_page_config(page_title="Virtual Health & Diet Planner", layout="wide")
 
-# Simple CSS to make landing pretty
+# Simple CSS to make landing pretty (read from disk once, not rebuilt per rerun)
+@st.cache_data
+def load_landing_css():
+    with open(LANDING_CSS, encoding="utf-8") as f:
+        return f.read()
+
 def local_css():
-    st.markdown("""
-    <style>
-    .landing {
-        background: linear-gradient(135deg, #f5f7fa 0%, #c3cfe2 100%);
-        padding: 30px;
-        border-radius: 12px;
-    }
-    .card {
-        background: white;
-        padding: 18px;
-        border-radius: 10px;
-        box-shadow: 0 6px 18px rgba(0,0,0,0.08);
-    }
-    .small {
-        font-size:14px; color:#444;
-    }
-    .title-big {
-        font-size:28px; font-weight:700;
-    }
-    </style>
-    """, unsafe_allow_html=True)
+    st.markdown(f"<style>{load_landing_css()}</style>", unsafe_allow_html=True)
 
 local_css()
 
@@ -335,16 +449,19 @@ if st.session_state.show_login:
 # If logged in, show profile form if profile missing
 if 'user_id' in st.session_state:
     uid = st.session_state.user_id
-    profile = get_profile(uid)
+    profile = _profile(uid)
     if profile is None:
-        st.subheader("Complete your profile")
-        with st.form("profile_form"):
+        # drawn into a placeholder so it can be cleared once saved, without an st.rerun()
+        profile_slot = st.empty()
+        profile_box = profile_slot.container()
+        profile_box.subheader("Complete your profile")
+        with profile_box.form("profile_form"):
             age = st.number_input("Age", min_value=8, max_value=120, value=25)
             sex = st.selectbox("Sex", ["Male","Female","Other"])
             height_cm = st.number_input("Height (cm)", min_value=50.0, max_value=250.0, value=170.0)
             weight_kg = st.number_input("Weight (kg)", min_value=20.0, max_value=300.0, value=70.0)
-            activity_level = st.selectbox("Activity level", list(ACTIVITY_MULTIPLIER.keys()))
-            goal = st.selectbox("Goal", ["Lose weight","Gain weight","Maintain","Build muscle"])
+            a_idx = st.selectbox("Activity level", range(len(ACTIVITY_LEVELS)), format_func=ACTIVITY_LEVELS.__getitem__)
+            g_idx = st.selectbox("Goal", range(len(GOALS)), format_func=GOALS.__getitem__)
             diet_pref = st.selectbox("Diet preference", ["veg","non-veg","vegan"])
             submitted = st.form_submit_button("Save profile")
             if submitted:
@@ -353,22 +470,26 @@ if 'user_id' in st.session_state:
                     "sex": sex,
                     "height_cm": float(height_cm),
                     "weight_kg": float(weight_kg),
-                    "activity_level": activity_level,
-                    "goal": goal,
+                    "activity_level": ACTIVITY_LEVELS[a_idx],
+                    "goal": GOALS[g_idx],
                     "diet_pref": diet_pref
                 }
                 save_profile(uid, p)
-                st.success("Profile saved! Redirecting to Dashboard...")
-                st.rerun()
+                st.session_state.just_saved = "Profile saved!"
+        if submitted:
+            profile_slot.empty()
 
 # -------------------------
 # MAIN APP: Dashboard area
 # -------------------------
 if 'user_id' in st.session_state:
     uid = st.session_state.user_id
-    profile = get_profile(uid)
+    profile = _profile(uid)
     if profile:
         st.title(f"Welcome, {st.session_state.get('username','User')} 👋")
+        # confirmation set by a save earlier in this run; no extra st.rerun() needed
+        if st.session_state.get('just_saved'):
+            st.success(st.session_state.pop('just_saved'))
         st.markdown("### Your personalized recommendations")
         # Top horizontal menu using tabs (appears just below title)
         tab1, tab2, tab3 = st.tabs(["📊 Dashboard", "🎯 Daily Goals", "📈 Progress"])
@@ -377,7 +498,9 @@ if 'user_id' in st.session_state:
             # Summary card
             bmi = calc_bmi(profile['weight_kg'], profile['height_cm'])
             bmr = calc_bmr(profile['sex'], profile['weight_kg'], profile['height_cm'], profile['age'])
-            tcal = target_calories(bmr, profile['activity_level'], profile['goal'])
+            a_idx = ACTIVITY_INDEX.get(profile['activity_level'], 0)
+            g_idx = GOAL_INDEX.get(profile['goal'], GOAL_INDEX["Maintain"])
+            tcal = target_calories(bmr, a_idx, g_idx)
             colA, colB, colC, colD = st.columns(4)
             colA.metric("BMI", f"{bmi} ({bmi_category(bmi)})")
             colB.metric("BMR (kcal/day)", f"{bmr}")
@@ -386,35 +509,26 @@ if 'user_id' in st.session_state:
             st.markdown("#### Diet suggestions (sample day)")
             diet_pref = profile['diet_pref']
             meals = []
+            foods_by_meal = recommend_foods(diet_pref)
             # For each meal type get 1-2 suggestions matched to diet_pref if possible
             for meal_type in ["breakfast","lunch","snack","dinner"]:
-                if "meal_type" in foods_df.columns:
-                    subset = foods_df[foods_df["meal_type"].str.lower() == meal_type]
-                else:
-                    st.error("⚠️ 'meal_type' column not found in foods_df")
-                    st.write("Available columns:", foods_df.columns.tolist())
-                    subset = pd.DataFrame()
-
-                pref_matched = subset[subset['diet_type'].str.lower()==diet_pref.lower()]
-                choice_df = pref_matched if not pref_matched.empty else subset
-                if choice_df.empty:
+                choices = foods_by_meal.get(meal_type, [])
+                if not choices:
                     meals.append((meal_type.capitalize(), "No data"))
                 else:
-                    sample = choice_df.sample(min(1,len(choice_df))).iloc[0]
+                    sample = choices[np.random.randint(len(choices))]
                     meals.append((meal_type.capitalize(), f"{sample['food_name']} — {int(sample['cal_per_serving'])} kcal"))
             for m in meals:
                 st.write(f"**{m[0]}** — {m[1]}")
             st.info("This is a sample meal plan from a small dataset. Replace foods.csv with a larger dataset for more variety.")
             # Exercise recommendations
             st.markdown("#### Exercise recommendations")
-            # match exercises by goal
-            desired = profile['goal']
-            ex_df['match'] = ex_df['goals'].str.lower().str.contains(desired.lower().split()[0])
-            # fallback: match any that contain 'maintenance' etc.
-            recs = ex_df[ex_df['goals'].str.lower().str.contains(desired.lower().split()[0])]
-            if recs.empty:
-                recs = ex_df.sample(min(3, len(ex_df)))
-            for i, r in recs.head(5).iterrows():
+            # match exercises by goal (falls back to a random few)
+            recs = recommend_exercises(profile['goal'])
+            if not recs:
+                exercises = load_exercises()
+                recs = exercises.sample(min(3, len(exercises))).to_dict('records')
+            for r in recs:
                 st.write(f"- **{r['exercise_name']}** ({r['duration_min']} min) — goals: {r['goals']} — difficulty: {r['difficulty']}")
             st.markdown("---")
             # Quick logging box for today's progress
@@ -425,9 +539,10 @@ if 'user_id' in st.session_state:
                 completed = st.checkbox("Completed planned exercise today?")
                 notes = st.text_area("Notes (optional)")
                 if st.form_submit_button("Save log"):
-                    add_progress(uid, datetime.now().date().isoformat(), float(w), int(calories), completed, notes)
-                    st.success("Saved today's log")
-                    st.experimental_rerun()
+                    add_progress(uid, datetime.now().date(), float(w), int(calories), completed, notes, force=True)
+                    st.session_state.just_saved = "Saved today's log"
+            if st.session_state.get('just_saved'):
+                st.success(st.session_state.pop('just_saved'))
 
         # --- DAILY GOALS tab ---
         with tab2:
@@ -458,6 +573,7 @@ if 'user_id' in st.session_state:
 
         # --- PROGRESS tab ---
         with tab3:
+            import altair as alt   # deferred: only the Progress tab draws charts
             st.header("Progress over time")
             dfp = get_progress(uid)
             if dfp.empty:
@@ -467,7 +583,7 @@ if 'user_id' in st.session_state:
                 st.markdown("**Weight over time**")
                 weight_df = dfp.dropna(subset=['weight_kg'])
                 if not weight_df.empty:
-                    chart = alt.Chart(weight_df).mark_line(point=True).encode(
+                    chart = alt.Chart(downsample(weight_df, 'weight_kg')).mark_line(point=True).encode(
                         x='date:T',
                         y='weight_kg:Q'
                     ).properties(width=700, height=300)
@@ -481,7 +597,7 @@ if 'user_id' in st.session_state:
                 if not cc.empty:
                     cc2 = cc.copy()
                     cc2['target'] = tcal
-                    chart2 = alt.Chart(cc2).transform_fold(['calories_consumed','target'], as_=['type','value']).mark_line(point=True).encode(
+                    chart2 = alt.Chart(downsample(cc2, 'calories_consumed')).transform_fold(['calories_consumed','target'], as_=['type','value']).mark_line(point=True).encode(
                         x='date:T',
                         y='value:Q',
                         color='type:N'
@@ -0,0 +1,55 @@
+# health_kernels.py
+# Numeric kernels kept out of app.py: Streamlit re-executes app.py on every rerun,
+# but this module stays in sys.modules, so the compiled numba dispatchers are built once.
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional: fall back to plain Python so deploys without it still work
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda f: f
+    prange = range
+
+
+@njit(parallel=True, cache=True)
+def calc_tcal_batch(sex_male, w, h, a, mult, adjust, out):
+    # Bulk target calories over arrays (e.g. every row of `profiles`), written into `out`
+    n = out.shape[0]
+    for i in prange(n):
+        out[i] = (10*w[i] + 6.25*h[i] - 5*a[i] + (5 if sex_male[i] else -161))*mult[i] + adjust[i]
+    return out
+
+
+@njit(cache=True)
+def lttb_indices(x, y, n_out):
+    # Largest-Triangle-Three-Buckets: keep first/last points and, per bucket,
+    # the point forming the largest triangle with the previous pick and next bucket's mean
+    n = x.shape[0]
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        start = int((i + 1) * every) + 1
+        end = min(int((i + 2) * every) + 1, n)
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(start, end):
+            avg_x += x[j]
+            avg_y += y[j]
+        avg_x /= end - start
+        avg_y /= end - start
+        max_area = -1.0
+        max_j = int(i * every) + 1
+        for j in range(int(i * every) + 1, start):
+            area = abs((x[a] - avg_x) * (y[j] - y[a]) - (x[a] - x[j]) * (avg_y - y[a]))
+            if area > max_area:
+                max_area = area
+                max_j = j
+        idx[i + 1] = max_j
+        a = max_j
+    return idx